@@ -0,0 +1,74 @@
+"""
+Delta crawl of the transparency.gov.au index.
+
+Compares the index against the fingerprints saved by the previous run and writes:
+- data/output/api_changeset.json         full add/update/delete changeset
+- data/output/CHANGED_GLOSSARY_URLS.csv  glossary pages that are new or changed
+- data/output/DELETED_GLOSSARY_URLS.csv  glossary pages that are gone or no longer selected
+
+Pages are picked with the same per-entity selection as fetch_glossary_urls.py, so the
+queue ends up with the same URLs as a full crawl would give.
+
+Re-extract and prune with the work queue:
+    python scripts/extraction/run_queue.py enqueue --csv data/output/CHANGED_GLOSSARY_URLS.csv --requeue
+    python scripts/extraction/run_queue.py remove --csv data/output/DELETED_GLOSSARY_URLS.csv
+
+Set MODIFIED_FIELD to the index's last-modified field, if it has one, so that only changed
+records are downloaded. Leave it unset to fall back to a full scan compared by content hash.
+"""
+
+from fetch_results_from_api import (
+    API_Extractor, DEFAULT_STATE_PATH, key_to_record, load_state, record_key, state_records
+)
+from fetch_glossary_urls import build_url, select_glossary_urls
+import csv
+import json
+import os
+
+CHANGESET_PATH = r"data/output/api_changeset.json"
+CHANGED_URLS_PATH = r"data/output/CHANGED_GLOSSARY_URLS.csv"
+DELETED_URLS_PATH = r"data/output/DELETED_GLOSSARY_URLS.csv"
+MODIFIED_FIELD = os.getenv("MODIFIED_FIELD") or None
+
+
+def selected_urls(state):
+    # Same per-entity selection as fetch_glossary_urls, applied to the whole index as of that crawl.
+    return {row[3]: row for row in select_glossary_urls(state_records(state))}
+
+
+def main():
+    extractor = API_Extractor()
+    before = selected_urls(load_state(DEFAULT_STATE_PATH))
+    changes = extractor.extract_delta(DEFAULT_STATE_PATH, modified_field=MODIFIED_FIELD)
+    after = selected_urls(load_state(DEFAULT_STATE_PATH))
+
+    with open(CHANGESET_PATH, "w", encoding="utf-8") as f:
+        json.dump(changes, f, ensure_ascii=False, indent=2)
+
+    # Re-extract selected pages whose record changed, and pages that are newly selected
+    # (including ones that became selected because another page of the entity went away).
+    changed_urls = {
+        build_url(key_to_record(record_key(r))) for r in changes["added"] + changes["updated"]
+    }
+    changed = [row for url, row in after.items() if url in changed_urls or url not in before]
+    with open(CHANGED_URLS_PATH, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Portfolio", "Entity", "BodyType", "Url"])
+        for row in changed:
+            writer.writerow(row)
+
+    # Drop pages that are no longer selected, whether deleted from the index or superseded.
+    deleted = [url for url in before if url not in after]
+    with open(DELETED_URLS_PATH, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Url"])
+        for url in deleted:
+            writer.writerow([url])
+
+    print(f"Changeset written to {CHANGESET_PATH}")
+    print(f"Changed glossary urls: {len(changed)}")
+    print(f"Deleted glossary urls: {len(deleted)}")
+
+
+if __name__ == "__main__":
+    main()
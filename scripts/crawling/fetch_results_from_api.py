@@ -1,11 +1,54 @@
 import requests
 import os
+import json
+import hashlib
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 load_dotenv()
+
+DEFAULT_STATE_PATH = r"data/output/api_fingerprints.json"
+KEY_FIELDS = ("PortfolioUrlSlug", "EntityUrlSlug", "UrlSlug")
+# Stored with each fingerprint so glossary URLs can be selected without downloading records again.
+META_FIELDS = ("Portfolio", "Entity", "BodyType")
+
+
+def record_key(record):
+    """Builds a stable key for an index record from its URL slugs."""
+    return "/".join(str(record.get(field) or "") for field in KEY_FIELDS)
+
+
+def key_to_record(key):
+    """Inverse of record_key. Only UrlSlug, the last part, can contain "/"."""
+    return dict(zip(KEY_FIELDS, key.split("/", 2)))
+
+
+def load_state(state_path=DEFAULT_STATE_PATH):
+    """Loads the fingerprints saved by extract_delta, or an empty state if there are none yet."""
+    if not os.path.exists(state_path):
+        return {"records": {}}
+    with open(state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def state_records(state):
+    """Rebuilds minimal index records (URL slugs plus Portfolio, Entity, BodyType) from a saved state."""
+    return [
+        {**key_to_record(key), **{field: fp.get(field) for field in META_FIELDS}}
+        for key, fp in state["records"].items()
+    ]
+
+
+def record_hash(record):
+    """Hashes a record's content, ignoring search metadata such as scores and highlights."""
+    content = {k: v for k, v in record.items() if not k.startswith("@")}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
 # Usage:
 # extractor = API_Extractor()
 # results = extractor.extract()
+# changes = extractor.extract_delta()  # {"added": [...], "updated": [...], "deleted": [...]}
 class API_Extractor:
     def __init__(self):
         self.api_url = os.getenv("API_URL")
@@ -26,21 +69,144 @@ class API_Extractor:
             "queryType": "simple"
         }
 
-    def extract(self):
+    def extract(self, strict=False, **overrides):
+        """
+        Fetches every record in the index, one batch at a time.
+        Keyword arguments override fields of the search payload (e.g. filter, select, orderby);
+        passing None drops the field.
+        With strict=True any failed request raises, and so does a scan that returns fewer
+        records than the reported count, instead of returning a partial result.
+        """
+        payload = {**self.payload_template, **overrides, "skip": 0}
+        payload = {k: v for k, v in payload.items() if v is not None}
         all_results = []
-        response = requests.post(self.api_url, headers=self.headers, json=self.payload_template)
+        response = requests.post(self.api_url, headers=self.headers, json=payload)
+        if strict:
+            response.raise_for_status()
         json_data = response.json()
         total_count = json_data.get('@odata.count', 0)
         all_results.extend(json_data.get('value', []))
 
-        batch_size = self.payload_template["top"]
+        batch_size = payload["top"]
         for skip in range(batch_size, total_count, batch_size):
-            self.payload_template["skip"] = skip
-            response = requests.post(self.api_url, headers=self.headers, json=self.payload_template)
+            payload["skip"] = skip
+            response = requests.post(self.api_url, headers=self.headers, json=payload)
             if response.status_code == 200:
                 all_results.extend(response.json().get('value', []))
+            elif strict:
+                response.raise_for_status()
             else:
                 print(f"⚠️ Failed to fetch batch at skip={skip}")
             print(f"🔄 Fetched {len(all_results)} records so far...")
+        if strict and len(all_results) != total_count:
+            raise RuntimeError(f"Incomplete scan: fetched {len(all_results)} of {total_count} records")
         return all_results
 
+    def scan_keys(self, records):
+        """
+        Returns the keys of a complete scan, raising if any key appears twice. Paging with skip
+        over a non-unique orderby can return one record twice and skip another while the total
+        still matches @odata.count, and the skipped record must not be taken as deleted.
+        """
+        keys = {record_key(r) for r in records}
+        if len(keys) != len(records):
+            raise RuntimeError(
+                f"Unreliable scan: {len(records) - len(keys)} duplicate records, so others may have been skipped"
+            )
+        return keys
+
+    def fetch_by_keys(self, keys, batch_size=50):
+        """
+        Fetches the records with the given keys, matching on UrlSlug and then on the full key.
+        Keys that could not be found are simply missing from the result.
+        """
+        wanted = set(keys)
+        slugs = sorted({key_to_record(key).get("UrlSlug", "") for key in wanted} - {""})
+        found = []
+        for i in range(0, len(slugs), batch_size):
+            batch = "|".join(slug.replace("'", "''") for slug in slugs[i:i + batch_size])
+            found.extend(
+                r for r in self.extract(strict=True, filter=f"search.in(UrlSlug, '{batch}', '|')")
+                if record_key(r) in wanted
+            )
+        return found
+
+    def extract_delta(self, state_path=DEFAULT_STATE_PATH, modified_field=None):
+        """
+        Fetches only records that are new or changed since the last crawl and saves the
+        fingerprint (key, last-modified value, content hash, plus Portfolio, Entity and BodyType)
+        of every record to state_path.
+        If modified_field names a sortable, filterable date field in the index, only records
+        modified since the last crawl are downloaded, newest first. A key-only scan then finds
+        deleted records, and new records the date filter missed (no date, or indexed late with an
+        older one), which are fetched by key. Changes to records without a date are not seen on
+        this path. Without modified_field, or if it differs from the field used by the last crawl,
+        the full index is downloaded and compared by content hash.
+        The first run, with no state file, reports every record as added.
+        Any failed or incomplete request raises before the state file is written, so a bad
+        response is never reported as deleted records.
+        Returns:
+            dict: 'added' and 'updated' lists of records, and a 'deleted' list of keys.
+        """
+        state = load_state(state_path)
+        previous = state["records"]
+        incremental = (
+            modified_field
+            and state.get("modified_field") == modified_field
+            and state.get("last_modified")
+        )
+
+        if incremental:
+            # ge rather than gt: records modified in the same second as the stored maximum after
+            # the last crawl ran would otherwise be missed. Unchanged ones are dropped by hash below.
+            changed = self.extract(
+                strict=True,
+                filter=f"{modified_field} ge {state['last_modified']}",
+                orderby=f"{modified_field} desc",
+            )
+            self.scan_keys(changed)
+            keys = self.extract(strict=True, select=",".join(KEY_FIELDS + META_FIELDS), highlight=None)
+            current_keys = self.scan_keys(keys)
+            missing = current_keys - previous.keys() - {record_key(r) for r in changed}
+            if missing:
+                found = self.fetch_by_keys(missing)
+                if {record_key(r) for r in found} == missing:
+                    changed.extend(found)
+                else:
+                    print("⚠️ Could not fetch all new records by key, falling back to a full scan")
+                    incremental = False
+        if not incremental:
+            orderby = f"{modified_field} desc" if modified_field else None
+            changed = self.extract(strict=True, **({"orderby": orderby} if orderby else {}))
+            current_keys = self.scan_keys(changed)
+
+        changes = {"added": [], "updated": [], "deleted": []}
+        records = {key: fp for key, fp in previous.items() if key in current_keys}
+        for r in changed:
+            key = record_key(r)
+            fingerprint = {
+                "modified": r.get(modified_field) if modified_field else None,
+                "hash": record_hash(r),
+                **{field: r.get(field) for field in META_FIELDS},
+            }
+            old = previous.get(key)
+            if old is None:
+                changes["added"].append(r)
+            elif old["hash"] != fingerprint["hash"]:
+                changes["updated"].append(r)
+            records[key] = fingerprint
+        changes["deleted"] = sorted(key for key in previous if key not in current_keys)
+
+        modified = [fp["modified"] for fp in records.values() if fp["modified"]]
+        state = {
+            "crawled_at": datetime.now(timezone.utc).isoformat(),
+            "modified_field": modified_field,
+            "last_modified": max(modified) if modified else (state.get("last_modified") if incremental else None),
+            "records": records,
+        }
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        print(f"🔄 Changes: {len(changes['added'])} added, {len(changes['updated'])} updated, "
+              f"{len(changes['deleted'])} deleted")
+        return changes
+
@@ -36,6 +36,15 @@ DEFAULT_HEADER_PATTERNS = [
     re.compile(r"^description / definition$", re.I),
 ]
 
+# Base confidence per extraction source, used when merging results in "merge" mode.
+SOURCE_CONFIDENCE = {
+    "table": 0.9,
+    "list": 0.7,
+    "paragraph": 0.5,
+}
+# Added to a term's confidence for each additional source that agrees on its definition.
+AGREEMENT_BONUS = 0.1
+
 # --- Start of redirection ---
 # Save the original stdout and stderr
 original_stdout = sys.stdout
@@ -268,13 +277,14 @@ class GlossaryExtractor:
     def setup_driver(self) -> webdriver.Chrome:
         driver = get_silent_chrome_driver()
         return driver
-    def extract_from_url(self, url: str) -> dict:
+    def extract_from_url(self, url: str, mode: str = "first_match") -> dict:
         """
         Loads the given URL, waits for the main content div, and extracts glossary data.
         Args:
             url (str): The URL to extract from.
+            mode (str): "first_match" (default) or "merge". See smart_extract_glossary.
         Returns:
-            dict: A dictionary with 'glossary' and 'sources' keys.
+            dict: A dictionary with 'glossary' and 'sources' keys (plus 'confidence' in merge mode).
         """
         driver = self.setup_driver()
         try:
@@ -302,21 +312,28 @@ class GlossaryExtractor:
             main_div = soup.find("div", class_="AnnualReportArticle_articleContent__eheNu")
             if not main_div:
                 print("    [ERROR] Main content div 'AnnualReportArticle_articleContent__eheNu' not found on page.")
-            return self.smart_extract_glossary(soup)
+            return self.smart_extract_glossary(soup, mode=mode)
         except Exception as e:
             print(f"    [ERROR] Error occurred: {e}")
             return {}
         finally:
             driver.quit()
 
-    def smart_extract_glossary(self, soup: BeautifulSoup) -> dict:
+    def smart_extract_glossary(self, soup: BeautifulSoup, mode: str = "first_match") -> dict:
         """
         Attempts to extract glossary data from the parsed HTML using tables, lists, then paragraphs.
+        In "first_match" mode the first format found wins. In "merge" mode every format is
+        extracted in a single pass and the results are merged (see merge_extract_glossary).
         Args:
             soup (BeautifulSoup): Parsed HTML soup.
+            mode (str): "first_match" (default) or "merge".
         Returns:
-            dict: A dictionary with 'glossary' and 'sources' keys.
+            dict: A dictionary with 'glossary' and 'sources' keys (plus 'confidence' in merge mode).
         """
+        if mode == "merge":
+            return self.merge_extract_glossary(soup)
+        if mode != "first_match":
+            raise ValueError(f"Unknown extraction mode: {mode!r}")
         glossary_data: Dict[str, str] = {}
         extraction_sources: Dict[str, str] = {}
         tables = soup.find_all("table")
@@ -344,4 +361,53 @@ class GlossaryExtractor:
                 for k in extracted:
                     extraction_sources[k] = 'paragraph'
                 glossary_data.update(extracted)
-        return {"glossary": glossary_data, "sources": extraction_sources}
\ No newline at end of file
+        return {"glossary": glossary_data, "sources": extraction_sources}
+
+    def merge_extract_glossary(self, soup: BeautifulSoup) -> dict:
+        """
+        Walks the DOM once, sending each table, list and paragraph to the matching parser,
+        and merges all results. Nodes nested inside a table or list are left to that parser.
+        When a term is found by several parsers, the definition from the most confident
+        source is kept (the last one seen, if several are equally confident) and agreeing
+        sources raise the term's confidence.
+        Args:
+            soup (BeautifulSoup): Parsed HTML soup.
+        Returns:
+            dict: A dictionary with 'glossary', 'sources' and 'confidence' keys.
+        """
+        candidates: Dict[str, List[Tuple[str, str]]] = {}
+
+        def add(extracted: Dict[str, str], source: str) -> None:
+            for term, definition in extracted.items():
+                candidates.setdefault(term, []).append((source, definition))
+
+        paragraphs: List[Tag] = []
+        for node in soup.find_all(["table", "ul", "ol", "p"]):
+            if node.find_parent(["table", "ul", "ol"]) is not None:
+                continue
+            if node.name == "table":
+                add(glossary_in_table(node, self.SKIP_WORDS, self.HEADER_PATTERNS), "table")
+            elif node.name in ("ul", "ol"):
+                add(glossary_in_list(node, self.SKIP_WORDS, self.HEADER_PATTERNS), "list")
+            else:
+                paragraphs.append(node)
+        if paragraphs:
+            add(glossary_in_paragraph(paragraphs, self.SKIP_WORDS, self.HEADER_PATTERNS), "paragraph")
+
+        glossary_data: Dict[str, str] = {}
+        extraction_sources: Dict[str, str] = {}
+        confidence: Dict[str, float] = {}
+        for term, found in candidates.items():
+            # Among equally confident sources the last one seen wins, as dict.update does in first_match mode.
+            source, definition = found[0]
+            for s, d in found[1:]:
+                if SOURCE_CONFIDENCE[s] >= SOURCE_CONFIDENCE[source]:
+                    source, definition = s, d
+            agreeing = {
+                s for s, d in found
+                if s != source and d.strip().lower() == definition.strip().lower()
+            }
+            glossary_data[term] = definition
+            extraction_sources[term] = source
+            confidence[term] = round(min(1.0, SOURCE_CONFIDENCE[source] + AGREEMENT_BONUS * len(agreeing)), 2)
+        return {"glossary": glossary_data, "sources": extraction_sources, "confidence": confidence}
@@ -0,0 +1,172 @@
+"""
+Queue-backed glossary extraction.
+
+Coordinator:  python run_queue.py enqueue
+Workers:      python run_queue.py work --workers 4
+Progress:     python run_queue.py status
+Delta crawl:  python run_queue.py enqueue --csv data/output/CHANGED_GLOSSARY_URLS.csv --requeue
+              python run_queue.py remove --csv data/output/DELETED_GLOSSARY_URLS.csv
+Export:       python run_queue.py export
+
+Each worker process claims one URL at a time with a lease, which it renews while the
+page is being extracted. Jobs from crashed workers are handed out again once their lease
+expires, and workers keep polling until no job is pending or claimed. Start more workers
+to increase throughput. The queue is single-host: every worker must run on the machine
+that holds the queue database (see JobQueue).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+import pandas as pd
+
+from work_queue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, JobQueue
+
+QUEUE_PATH = r"data/output/extraction_queue.db"
+URLS_PATH = r"data/output/FINAL_GLOSSARY_URLS.csv"
+EXPORT_PATH = r"data/output/queue_glossary.json"
+
+
+def enqueue(args: argparse.Namespace) -> None:
+    df = pd.read_csv(args.csv)
+    queue = JobQueue(args.db)
+    added = queue.enqueue(df.to_dict("records"), requeue=args.requeue)
+    if args.requeue:
+        print(f"Enqueued {len(df)} URLs for (re-)extraction")
+    else:
+        print(f"Enqueued {added} new URLs ({len(df) - added} already queued)")
+    print(queue.stats())
+    queue.close()
+
+
+def remove(args: argparse.Namespace) -> None:
+    df = pd.read_csv(args.csv)
+    queue = JobQueue(args.db)
+    removed = queue.remove(df["Url"])
+    print(f"Removed {removed} URLs and their results")
+    print(queue.stats())
+    queue.close()
+
+
+def heartbeat(db_path: str, url: str, worker_id: str, lease_seconds: int, stop: threading.Event) -> None:
+    # Uses its own connection, as SQLite connections cannot be shared between threads.
+    queue = JobQueue(db_path, lease_seconds=lease_seconds)
+    try:
+        while not stop.wait(lease_seconds / 3):
+            if not queue.renew(url, worker_id):
+                break
+    finally:
+        queue.close()
+
+
+def worker_loop(db_path: str, worker_id: str, mode: str, lease_seconds: int, max_attempts: int) -> None:
+    # Imported here because extractor silences stdout/stderr on import.
+    from extractor import GlossaryExtractor
+
+    queue = JobQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    extractor = GlossaryExtractor()
+    while True:
+        job = queue.claim(worker_id)
+        if job is None:
+            # Other workers may still hold leases; wait in case one of them has crashed.
+            wait = queue.seconds_until_available()
+            if wait is None:
+                break
+            time.sleep(max(wait, 1.0))
+            continue
+        stop = threading.Event()
+        renewer = threading.Thread(
+            target=heartbeat, args=(db_path, job["url"], worker_id, lease_seconds, stop), daemon=True
+        )
+        renewer.start()
+        try:
+            data = extractor.extract_from_url(job["url"], mode=mode)
+        except Exception as e:
+            queue.fail(job["url"], worker_id, str(e))
+            continue
+        finally:
+            stop.set()
+            renewer.join()
+        # extract_from_url returns an empty dict when the page could not be loaded.
+        if "glossary" not in data:
+            queue.fail(job["url"], worker_id, "extraction failed")
+            continue
+        queue.complete(job["url"], worker_id, data)
+    queue.close()
+
+
+def work(args: argparse.Namespace) -> None:
+    host = socket.gethostname()
+    processes = []
+    for n in range(args.workers):
+        worker_id = f"{host}-{os.getpid()}-{n}"
+        p = multiprocessing.Process(
+            target=worker_loop,
+            args=(args.db, worker_id, args.mode, args.lease, args.max_attempts),
+        )
+        p.start()
+        processes.append(p)
+    for p in processes:
+        p.join()
+    queue = JobQueue(args.db)
+    print(queue.stats())
+    queue.close()
+
+
+def status(args: argparse.Namespace) -> None:
+    queue = JobQueue(args.db)
+    if args.retry_failed:
+        print(f"Requeued {queue.requeue_failed()} failed URLs")
+    print(queue.stats())
+    queue.close()
+
+
+def export(args: argparse.Namespace) -> None:
+    queue = JobQueue(args.db)
+    results = queue.results()
+    queue.close()
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queue-backed glossary extraction")
+    parser.add_argument("--db", default=QUEUE_PATH, help="Path to the queue database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("enqueue", help="Add glossary URLs to the queue")
+    p.add_argument("--csv", default=URLS_PATH, help="CSV with Portfolio, Entity, BodyType, Url columns")
+    p.add_argument("--requeue", action="store_true", help="Re-extract URLs that are already queued")
+    p.set_defaults(func=enqueue)
+
+    p = commands.add_parser("remove", help="Remove URLs and their results from the queue")
+    p.add_argument("--csv", required=True, help="CSV with a Url column")
+    p.set_defaults(func=remove)
+
+    p = commands.add_parser("work", help="Run worker processes until every job is done or failed")
+    p.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    p.add_argument("--mode", default="first_match", choices=["first_match", "merge"])
+    p.add_argument("--lease", type=int, default=DEFAULT_LEASE_SECONDS, help="Lease length in seconds")
+    p.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    p.set_defaults(func=work)
+
+    p = commands.add_parser("status", help="Show job counts per status")
+    p.add_argument("--retry-failed", action="store_true", help="Requeue failed jobs")
+    p.set_defaults(func=status)
+
+    p = commands.add_parser("export", help="Write all results to JSON")
+    p.add_argument("--output", default=EXPORT_PATH)
+    p.set_defaults(func=export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
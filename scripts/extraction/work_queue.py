@@ -0,0 +1,278 @@
+"""SQLite-backed job queue for running glossary extraction across several worker processes on one host."""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    portfolio TEXT,
+    entity TEXT,
+    bodytype TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    url TEXT PRIMARY KEY,
+    entity TEXT,
+    glossary TEXT NOT NULL,
+    sources TEXT NOT NULL,
+    confidence TEXT,
+    worker TEXT,
+    finished_at REAL
+);
+"""
+
+
+class JobQueue:
+    """
+    A lease-based work queue stored in a single SQLite file.
+    A coordinator enqueues URLs, and any number of worker processes claim jobs with a lease.
+    Workers renew their lease while a job runs. A job whose lease expires (e.g. because its
+    worker crashed) is handed out again.
+    Results are keyed by URL, so re-running a job overwrites rather than duplicates it.
+    Every process must open its own JobQueue. The database runs in WAL mode, which needs
+    shared memory between connections, so all workers must run on the same host as the
+    database file. Putting the file on network storage for workers on other hosts is not supported.
+    """
+    def __init__(
+        self,
+        db_path: str,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ):
+        """
+        Opens (and creates if needed) the queue database.
+        Args:
+            db_path (str): Path to the SQLite database file.
+            lease_seconds (int): How long a claimed job stays reserved for its worker.
+            max_attempts (int): Claims allowed per job before it is marked as failed.
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the block in a write transaction, rolling back if it raises."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def enqueue(self, jobs: Iterable[Dict[str, str]], requeue: bool = False) -> int:
+        """
+        Adds jobs to the queue. URLs already in the queue are left untouched unless requeue is set,
+        in which case they are reset to pending so they are extracted again (e.g. after a delta crawl).
+        Args:
+            jobs (Iterable[Dict[str, str]]): Dicts with 'Url' and optionally 'Portfolio', 'Entity', 'BodyType'.
+            requeue (bool): Reset URLs that are already queued.
+        Returns:
+            int: The number of jobs added or reset.
+        """
+        now = time.time()
+        rows = [
+            (job["Url"], job.get("Portfolio"), job.get("Entity"), job.get("BodyType"), now)
+            for job in jobs
+        ]
+        sql = "INSERT OR IGNORE INTO jobs (url, portfolio, entity, bodytype, updated_at) VALUES (?, ?, ?, ?, ?)"
+        if requeue:
+            sql = (
+                "INSERT INTO jobs (url, portfolio, entity, bodytype, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET portfolio = excluded.portfolio, entity = excluded.entity, "
+                "bodytype = excluded.bodytype, status = 'pending', worker = NULL, lease_expires = NULL, "
+                "attempts = 0, error = NULL, updated_at = excluded.updated_at"
+            )
+        before = self.conn.total_changes
+        with self._transaction() as conn:
+            conn.executemany(sql, rows)
+        return self.conn.total_changes - before
+
+    def remove(self, urls: Iterable[str]) -> int:
+        """
+        Deletes jobs and their results, e.g. for pages that no longer exist in the index.
+        Args:
+            urls (Iterable[str]): URLs to remove.
+        Returns:
+            int: The number of jobs removed.
+        """
+        rows = [(url,) for url in urls]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany("DELETE FROM jobs WHERE url = ?", rows)
+            removed = conn.total_changes - before
+            conn.executemany("DELETE FROM results WHERE url = ?", rows)
+        return removed
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """
+        Reserves the next available job for the given worker.
+        Pending jobs and claimed jobs with an expired lease are both eligible.
+        Args:
+            worker (str): Identifier of the claiming worker.
+        Returns:
+            Optional[Dict]: The claimed job row, or None if nothing is available.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases that have used up their attempts are not handed out again.
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', worker = NULL, lease_expires = NULL, "
+                "error = COALESCE(error, 'lease expired'), updated_at = ? "
+                "WHERE status = 'claimed' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs "
+                "WHERE status = 'pending' OR (status = 'claimed' AND lease_expires < ?) "
+                "ORDER BY attempts, updated_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'claimed', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                (worker, now + self.lease_seconds, now, row["url"]),
+            )
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def renew(self, url: str, worker: str) -> bool:
+        """
+        Extends the lease on a job the worker is still running.
+        Args:
+            url (str): The job URL.
+            worker (str): Identifier of the worker holding the lease.
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE url = ? AND status = 'claimed' AND worker = ?",
+            (time.time() + self.lease_seconds, url, worker),
+        )
+        return cursor.rowcount == 1
+
+    def seconds_until_available(self) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: 0 if a job is pending, the time until the earliest active lease
+            expires if jobs are still claimed, or None if no job is pending or claimed.
+        """
+        if self.conn.execute("SELECT 1 FROM jobs WHERE status = 'pending' LIMIT 1").fetchone():
+            return 0.0
+        earliest = self.conn.execute("SELECT MIN(lease_expires) FROM jobs WHERE status = 'claimed'").fetchone()[0]
+        if earliest is None:
+            return None
+        return max(0.0, earliest - time.time())
+
+    def complete(self, url: str, worker: str, data: dict) -> bool:
+        """
+        Stores the extraction result for a job and marks it done.
+        Only the worker currently holding the lease can complete the job, so a late result from
+        a worker whose lease expired, or whose job was requeued, is discarded.
+        The result row is replaced if it already exists, so re-running a job leaves a single result.
+        Args:
+            url (str): The job URL.
+            worker (str): Identifier of the worker that ran the job.
+            data (dict): Output of GlossaryExtractor.extract_from_url.
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            job = conn.execute(
+                "SELECT entity FROM jobs WHERE url = ? AND status = 'claimed' AND worker = ?",
+                (url, worker),
+            ).fetchone()
+            if job is None:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO results (url, entity, glossary, sources, confidence, worker, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    job["entity"],
+                    json.dumps(data.get("glossary", {}), ensure_ascii=False),
+                    json.dumps(data.get("sources", {}), ensure_ascii=False),
+                    json.dumps(data["confidence"]) if "confidence" in data else None,
+                    worker,
+                    now,
+                ),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'done', lease_expires = NULL, error = NULL, updated_at = ? WHERE url = ?",
+                (now, url),
+            )
+        return True
+
+    def fail(self, url: str, worker: str, error: str) -> None:
+        """
+        Releases a job after a failed attempt. It goes back to pending until it runs out of attempts.
+        Only the worker currently holding the lease can release the job.
+        Args:
+            url (str): The job URL.
+            worker (str): Identifier of the worker that ran the job.
+            error (str): Short description of the failure.
+        """
+        self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+            "WHERE url = ? AND status = 'claimed' AND worker = ?",
+            (self.max_attempts, error, time.time(), url, worker),
+        )
+
+    def requeue_failed(self) -> int:
+        """
+        Puts every failed job back to pending with a fresh attempt count.
+        Returns:
+            int: The number of jobs requeued.
+        """
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, error = NULL, updated_at = ? WHERE status = 'failed'",
+            (time.time(),),
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Number of jobs per status.
+        """
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def results(self) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: All stored results, with glossary, sources and confidence decoded.
+        """
+        results = []
+        for row in self.conn.execute("SELECT * FROM results ORDER BY entity, url"):
+            result = dict(row)
+            for key in ("glossary", "sources", "confidence"):
+                if result[key] is not None:
+                    result[key] = json.loads(result[key])
+            results.append(result)
+        return results